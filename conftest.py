@@ -0,0 +1,2 @@
+# notify_test.py is a manual toast check for Windows, not a pytest module
+collect_ignore = ["notify_test.py"]
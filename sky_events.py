@@ -7,42 +7,91 @@ Goal Today: a tiny CLI that prints a pastel banner and echoes your inputs.
 
 from __future__ import annotations
 import argparse 
+import asyncio
 import datetime as dt 
-from dateutil import tz 
-from colorama import init as color_init, Fore, Style
 import requests
-from ics import Calendar
-from ics import Calendar, Event
-import pytz
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import functools
+import json
 import os
+import re
+from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
 # --- Windows notifications (winotify only) ---
-try:
-    from winotify import Notification
-    def notify(title: str, body: str):
-        n = Notification(app_id="SkyEvents",
-                        title=title,
-                        msg=body,
-                        duration="short").show()
-except Exception:
-    # Fallback: no-op if  winotify isnt avaliable
-    def notify(title: str, body: str):
-        pass
+# winotify is imported on the first toast, so runs without --notify never load it
+@functools.lru_cache(maxsize=None)
+def _notifier():
+    """Return the toast function: winotify if it imports, otherwise a no-op."""
+    try:
+        from winotify import Notification
+    except Exception:
+        # Fallback: no-op if  winotify isnt avaliable
+        return lambda title, body: None
+
+    def show(title: str, body: str):
+        Notification(app_id="SkyEvents",
+                     title=title,
+                     msg=body,
+                     duration="short").show()
+    return show
+
+def notify(title: str, body: str):
+    _notifier()(title, body)
+
+def notify_all(toasts):
+    """Show (title, body) toasts in order."""
+    for title, body in toasts:
+        notify(title, body)
 
 N2YO_BASE = "https://api.n2yo.com/rest/v1/satellite/visualpasses"
 ISS_NORAD = 25544
 
 # --- Settings: adjust if you ever move timezones ---
-DEFAULT_TZ = tz.gettz("America/New_York")
+DEFAULT_TZ = ZoneInfo("America/New_York")
 # Source In-The-Sky iCal feed of astronomy events
 IN_THE_SKY_ICS = "https://in-the-sky.org/newscalyear_ical.php?maxdiff=7&year={year}"
 
-KEYWORDS = (
-    "meteor shower",
-    "eclipse"      #solar or lunar
-)
+# Downloaded ICS bodies + their ETag/Last-Modified validators live here
+CACHE_DIR = Path.home() / ".cache" / "skyevents"
+
+# One shared HTTP session so repeat fetches reuse the same TLS connection
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "SkyEvents/1.0"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4,
+                                      max_retries=Retry(total=2, backoff_factor=0.3)))
+
+# Event keywords -> display type; one compiled alternation instead of a loop of substring checks
+KEYWORDS = {
+    "meteor shower": "Meteor Shower",
+    "eclipse": "Eclipse",      #solar or lunar
+}
+_KW_RE = re.compile("|".join(map(re.escape, KEYWORDS)), re.I)
+
+# Display formats, shared by every printed/notified time
+WHEN_FMT = "%a %b %d, %I:%M %p %Z"
+TIME_FMT = "%I:%M %p %Z"
+
+_TZID_RE = re.compile(r";TZID=([^;]+)")
+_ESC_RE = re.compile(r"\\([\\;,nN])")      # one pass, so an escaped backslash can't start another escape
+
+@dataclass(slots=True, frozen=True)
+class Event:
+    """One upcoming sky event, from either feed. Times are DEFAULT_TZ-aware."""
+    type: str
+    name: str
+    start: dt.datetime
+    when_str: str                       # start pre-formatted with WHEN_FMT
+    source: str
+    end: dt.datetime | None = None
+    end_str: str | None = None          # end pre-formatted with TIME_FMT
+    mag: float | None = None
+
+_BY_START = attrgetter("start")
 
 def now_local() -> dt.datetime:
     """Timezone aware 'now' so our printing is always correct."""
@@ -50,49 +99,203 @@ def now_local() -> dt.datetime:
 
 def banner(title: str) -> None:
     """Soft-but-bold console banner."""
+    from colorama import init as color_init, Fore, Style
     color_init(autoreset=True)
     print(Style.BRIGHT + Fore.MAGENTA + f"\n* {title} *\n" + Style.RESET_ALL)
 
-def fetch_astronomy_ics(year: int) -> Calendar:
-    """Download the astronomy  iCal feed for the given year."""
-    url = IN_THE_SKY_ICS.format(year=year)
-    r = requests.get(url, timeout=30)
+def _unfold(lines):
+    """Glue RFC 5545 folded continuation lines back onto their logical line."""
+    buf = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+        if line[0] in " \t" and buf is not None:
+            buf += line[1:]
+            continue
+        if buf is not None:
+            yield buf
+        buf = line
+    if buf is not None:
+        yield buf
+
+def _scan_vevents(lines):
+    """
+    Tiny line-by-line iCal state machine.
+    Yields (summary, (dtstart_params, dtstart_value) or None) per VEVENT; nothing else is kept.
+    Only the VEVENT's own properties count, not those of nested VALARMs etc.
+    """
+    depth = 0   # 0 = outside any VEVENT, 1 = VEVENT itself, 2+ = a component nested in it
+    summary = start = None
+    for line in _unfold(lines):
+        if depth == 0:
+            if line == "BEGIN:VEVENT":
+                depth, summary, start = 1, None, None
+        elif line.startswith("BEGIN:"):
+            depth += 1
+        elif line.startswith("END:"):
+            depth -= 1
+            if depth == 0 and summary is not None:
+                yield summary, start
+        elif depth == 1:
+            key, _, value = line.partition(":")
+            if key.startswith("SUMMARY"):
+                summary = value
+            elif key.startswith("DTSTART"):
+                start = (key[len("DTSTART"):], value)
+
+def _discard(path: Path) -> None:
+    """Remove a leftover cache file, ignoring errors (the cache is best-effort)."""
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+def _scan_and_cache(r, body_path: Path, meta_path: Path) -> list:
+    """Scan a full (non-304) feed response, copying it to the on-disk cache as it streams."""
     r.raise_for_status()
-    return Calendar(r.text)
+    r.encoding = "utf-8"    # iCal default; requests would guess ISO-8859-1 for text/*
+    lines = r.iter_lines(chunk_size=64 * 1024, decode_unicode=True)
+
+    # Cache is best-effort; a read-only home or a locked file shouldn't break the fetch
+    tmp = body_path.with_suffix(".tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache = tmp.open("w", encoding="utf-8")
+    except OSError:
+        return list(_scan_vevents(lines))
+
+    cache_ok = True
+    def tee(lines):
+        """Pass lines through unchanged, copying them to the cache until a write fails."""
+        nonlocal cache_ok
+        for line in lines:
+            if cache_ok:
+                try:
+                    cache.write(line + "\n")
+                except OSError:
+                    cache_ok = False
+            yield line
+
+    try:
+        events = list(_scan_vevents(tee(lines)))
+    except Exception:
+        cache_ok = False    # partial body; don't keep it
+        raise
+    finally:
+        try:
+            cache.close()
+        except OSError:
+            cache_ok = False
+        if not cache_ok:
+            _discard(tmp)
 
-def extract_meteors_eclipses(cal: Calendar, horizon_days: int):
-    """Filter the calendar for meteors & eclipses within horizon_days""" 
-    cutoff = now_local() + dt.timedelta(days=horizon_days)
+    if cache_ok:
+        try:
+            tmp.replace(body_path)
+            # validators only once the body they describe is in place
+            meta_path.write_text(json.dumps({
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+            }), encoding="utf-8")
+        except OSError:
+            _discard(tmp)
+    return events
+
+@functools.lru_cache(maxsize=None)
+def fetch_astronomy_ics(year: int) -> list:
+    """
+    Stream the astronomy iCal feed for the given year into (summary, dtstart) pairs.
+    Uses a conditional GET against the on-disk copy, so an unchanged feed is a 304 with no body.
+    """
+    url = IN_THE_SKY_ICS.format(year=year)
+    body_path = CACHE_DIR / f"{year}.ics"
+    meta_path = CACHE_DIR / f"{year}.json"
+
+    headers = {}
+    if body_path.exists() and meta_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = {}
+        if not isinstance(meta, dict):
+            meta = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    with SESSION.get(url, headers=headers, stream=True, timeout=30) as r:
+        if r.status_code != 304:
+            return _scan_and_cache(r, body_path, meta_path)
+        try:
+            with body_path.open(encoding="utf-8") as f:
+                return list(_scan_vevents(f))
+        except (OSError, UnicodeDecodeError):
+            # the server keeps answering 304 to these validators, so drop the bad copy
+            _discard(body_path)
+            _discard(meta_path)
+
+    # retry once without validators to rebuild the cache
+    with SESSION.get(url, stream=True, timeout=30) as r:
+        return _scan_and_cache(r, body_path, meta_path)
+
+def _parse_ics_dt(params: str, value: str) -> dt.datetime | None:
+    """Turn a DTSTART value (UTC, floating/TZID, or all-day date) into an aware datetime."""
+    try:
+        if value.endswith("Z"):
+            return dt.datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=dt.timezone.utc)
+        if len(value) == 8:
+            # all-day events start at UTC midnight, same as the ics library did
+            return dt.datetime.strptime(value, "%Y%m%d").replace(tzinfo=dt.timezone.utc)
+        m = _TZID_RE.search(params)
+        try:
+            zone = ZoneInfo(m.group(1).strip('"')) if m else DEFAULT_TZ
+        except (ZoneInfoNotFoundError, ValueError):
+            zone = DEFAULT_TZ
+        return dt.datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=zone)
+    except ValueError:
+        return None
+
+def _ics_unescape(text: str) -> str:
+    """Undo iCal TEXT escaping (backslashed commas, semicolons, newlines) for display."""
+    return _ESC_RE.sub(lambda m: " " if m.group(1) in "nN" else m.group(1), text)
+
+def extract_meteors_eclipses(events, horizon_days: int):
+    """Filter scanned (summary, dtstart) pairs for meteors & eclipses within horizon_days""" 
+    now = now_local()
+    cutoff = now + dt.timedelta(days=horizon_days)
     out = []
-    for ev in cal.events:
-        name = (ev.name or "").strip()
-        lname = name.lower()
-        if not any(k in lname for k in KEYWORDS):
+    for summary, dtstart in events:
+        # keywords contain nothing iCal escapes, so filter on the raw text first
+        kw = _KW_RE.search(summary)
+        if not kw:
             continue
+        name = _ics_unescape(summary).strip()
 
-        start = ev.begin.datetime if ev.begin else None
+        start = _parse_ics_dt(*dtstart) if dtstart else None
         if not start:
             continue
 
         start = start.astimezone(DEFAULT_TZ)
-        if start < now_local() or start > cutoff:
+        if start < now or start > cutoff:
             continue
-        etype = "Meteor Shower"  if "meteor shower" in lname else ("Eclipse" if "eclipse" in lname else "Event")
-        out.append({
-            "type": etype,
-            "name": name,
-            "start": start,
-            "source": "In-The-Sky iCal"
-
-        })
-    out.sort(key=lambda e: e["start"])
+        etype = KEYWORDS[kw.group(0).lower()]
+        out.append(Event(
+            type=etype,
+            name=name,
+            start=start,
+            when_str=start.strftime(WHEN_FMT),
+            source="In-The-Sky iCal",
+        ))
+    out.sort(key=_BY_START)
     return out
 
 def fetch_iss_passes(lat: float, lon: float, alt_m: int, days: int, min_elev: int = 10):
     """
     Get visible ISS passes for your location using N2YO.
     min_elev filters out low, meh passes (30 degrees = decent).
-    Returns a list of dicts sorted by start time. 
+    Returns a list of Events sorted by start time. 
     """
     api_key = os.environ.get("N2YO_API_KEY")
     if not api_key:
@@ -100,7 +303,7 @@ def fetch_iss_passes(lat: float, lon: float, alt_m: int, days: int, min_elev: in
     
     url = f"{N2YO_BASE}/{ISS_NORAD}/{lat:.4f}/{lon:.4f}/{alt_m}/{days}/{min_elev}/&apiKey={api_key}"
     try: 
-        r = requests.get(url, timeout=30)
+        r = SESSION.get(url, timeout=30)
         r.raise_for_status()
         data = r.json()
     except Exception:
@@ -109,44 +312,57 @@ def fetch_iss_passes(lat: float, lon: float, alt_m: int, days: int, min_elev: in
     passes = data.get("passes", []) or []
     out = []
     for p in passes:
-        start_utc = dt.datetime.fromtimestamp(p.get("startUTC", 0), tz=dt.timezone.utc)
-        end_utc = dt.datetime.fromtimestamp(p.get("endUTC", 0), tz=dt.timezone.utc)
-        start = start_utc.astimezone(DEFAULT_TZ)
-        end = end_utc.astimezone(DEFAULT_TZ)
+        # Epoch seconds go straight to local time; no UTC datetime + astimezone round trip
+        start = dt.datetime.fromtimestamp(p.get("startUTC", 0), tz=DEFAULT_TZ)
+        end = dt.datetime.fromtimestamp(p.get("endUTC", 0), tz=DEFAULT_TZ)
         max_el = int(p.get("maxEl", 0))
         mag = p.get("mag", None)
 
-        out.append({
-            "type": "ISS Pass",
-            "name": f"ISS visible pass (max elev ~{max_el}°)",
-            "start": start,
-            "end": end,
-            "mag": mag,
-            "source": "N2YO"
-        })
-
-    out.sort(key=lambda e: e["start"])
+        out.append(Event(
+            type="ISS Pass",
+            name=f"ISS visible pass (max elev ~{max_el}°)",
+            start=start,
+            end=end,
+            when_str=start.strftime(WHEN_FMT),
+            end_str=end.strftime(TIME_FMT),
+            mag=mag,
+            source="N2YO",
+        ))
+
+    out.sort(key=_BY_START)
     return out
 
+async def fetch_iss_passes_async(lat: float, lon: float, alt_m: int, days: int, min_elev: int = 10):
+    """
+    fetch_iss_passes on a worker thread, so the N2YO call overlaps the ICS work.
+    Never raises: a bad payload just means no ISS passes, same as a failed request.
+    """
+    try:
+        return await asyncio.to_thread(fetch_iss_passes, lat, lon, alt_m, days, min_elev)
+    except Exception:
+        return []
+
 def export_ics (events, path_str: str):
     """
     Writes a merged list of events to an .ics file your phone can subscribe to .
-    Expects each item to have: name, start (datetime), and optional end, type, source.
+    Expects a list of Event (name, start, and optional end; type/source go in the title/description).
     """
 
+    from ics import Calendar, Event as IcsEvent     # only needed for --export-ics
+
     path = Path(path_str)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    cal = Caendar()
+    cal = Calendar()
     for e in events:
-        ev = Events()
-        title_type = e.get("type", "").strip()
-        ev.name = f"{title_type}: {e['name']}" if title_type else e["name"]
-        ev.begin = e["start"]    # timezone-aware datetime
-        if e.get("end"):
-            ev.end = e["end"]
+        ev = IcsEvent()
+        title_type = e.type.strip()
+        ev.name = f"{title_type}: {e.name}" if title_type else e.name
+        ev.begin = e.start    # timezone-aware datetime
+        if e.end:
+            ev.end = e.end
         # tasteful description
-        src = e.get("source", "Sky_Events")
+        src = e.source or "Sky_Events"
         ev.description = f"From {src}. Generated by SkyEvents."
         cal.events.add(ev)
 
@@ -159,7 +375,7 @@ def export_ics (events, path_str: str):
 
     
 
-def main():
+async def main():
     # 1) CLI: we keep it explicit-no magic guesses. 
     ap = argparse.ArgumentParser(description="Sky Events - Starlace Build")
     ap.add_argument("--lat", type=float, required=True, help="Latitude (decimal degrees)")
@@ -173,20 +389,28 @@ def main():
     args = ap.parse_args()
 
     # 2) Vibes + echo
+    now = now_local()
+    # ISS request goes out now and is only awaited right before it's printed
+    iss_task = asyncio.create_task(fetch_iss_passes_async(args.lat, args.lon, args.alt, args.days))
+    from colorama import Fore, Style
     banner("Sky Events - Hello SpaceJunkie")
     print(Fore.CYAN + "Your settings:" + Style.RESET_ALL)
     print(f"- Latitude:     {args.lat}")
     print(f"- Longitude:    {args.lon}")
     print(f"- Altitude:     {args.alt} m")
     print(f"- Horizon:      {args.days} days")
-    print(f"- Now:          {now_local().strftime('%a %b %d, %I:%M %p %Z')}")
+    print(f"- Now:          {now.strftime(WHEN_FMT)}")
 
     # --- Astrononmy events ---
-    years = {now_local().year, (now_local() + dt.timedelta(days=args.days)).year}
+    years = sorted({now.year, (now + dt.timedelta(days=args.days)).year})
+    cals = await asyncio.gather(*(asyncio.to_thread(fetch_astronomy_ics, y) for y in years),
+                                return_exceptions=True)
     all_events = []
-    for y in sorted(years):
+    for y, cal in zip(years, cals):
+        if isinstance(cal, Exception):
+            print(f"[Error fetching {y} feeds: {cal}]")
+            continue
         try:
-            cal = fetch_astronomy_ics(y)
             all_events += extract_meteors_eclipses(cal, args.days)
         except Exception as ex:
             print(f"[Error fetching {y} feeds: {ex}]")
@@ -194,45 +418,50 @@ def main():
     print("\nAstronomy events coming up:")
     if all_events:
         for e in all_events:
-            when = e["start"].strftime("%a %b %d, %I:%M %p %Z")
-            print(f"- {e['type']}: {e['name']} - {when}")
+            print(f"- {e.type}: {e.name} - {e.when_str}")
     else:
         print("- None found in range")
 
     # --- ISS Passes ---
-    iss_events = fetch_iss_passes(args.lat, args.lon, args.alt, args.days)
+    iss_events = await iss_task
     print("\nISS passes:")
     if iss_events:
         for e in iss_events:
-            start = e["start"].strftime("%a %b %d, %I:%M %p %Z")
-            end = e["end"].strftime("%I:%M %p %Z")
-            extra = f" (mag {e['mag']})" if e.get('mag') is not None else ""
-            print(f"- {e['name']} - {start} -> {end}{extra}")
+            extra = f" (mag {e.mag})" if e.mag is not None else ""
+            print(f"- {e.name} - {e.when_str} -> {e.end_str}{extra}")
     else:
         print("- None found or N2YO_API_KEY not set.")
 
      # --- Optional notifications ---
+    toast_job = None
     if args.notify:
         upcoming = (all_events + iss_events)
-        upcoming.sort(key=lambda e: e["start"])
+        upcoming.sort(key=_BY_START)
+        toasts = []
         for e in upcoming[:2]:
             title = "Sky Event"
-            when = e["start"].strftime("%a %b %d, %I:%M %p %Z")
-            body = f"{e['type']}: {e['name']} at {when}"
+            body = f"{e.type}: {e.name} at {e.when_str}"
             # debug print so you can see its being calles
             print(f"[notify] {body}")
-            notify(title, body)
+            toasts.append((title, body))
+        # winotify blocks while it shells out, so toasts run on a worker thread while
+        # the export runs, one after another so the soonest event still shows first
+        # (run_in_executor starts the thread now; a to_thread task wouldn't until the next await)
+        toast_job = asyncio.get_running_loop().run_in_executor(None, notify_all, toasts)
 
     # Merge and sort for any downstream actions (notify/export/etc.)
     combined = (all_events + iss_events)
-    combined.sort(key=lamda e: e["start"])
+    combined.sort(key=_BY_START)
 
     # --- Export .ics if asked ---
     if args.export_ics:
         export_ics(combined, args.export_ics)
 
+    if toast_job:
+        await toast_job
+
 if __name__ == "__main__":
-    raise SystemExit(main()) 
+    raise SystemExit(asyncio.run(main())) 
 
 
 
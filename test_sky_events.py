@@ -0,0 +1,161 @@
+"""Checks for the hand-rolled iCal scanner, date parsing and ICS cache in sky_events.py."""
+
+import datetime as dt
+import json
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import sky_events as se
+
+
+def scan(text: str):
+    return list(se._scan_vevents(text.splitlines(True)))
+
+
+def test_scan_unfolds_crlf_continuation_lines():
+    text = (
+        "BEGIN:VCALENDAR\r\n"
+        "BEGIN:VEVENT\r\n"
+        "SUMMARY;LANGUAGE=en:Geminid meteor\r\n"
+        "  shower\r\n"
+        "DTSTART:20261214T060000Z\r\n"
+        "END:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+    assert scan(text) == [("Geminid meteor shower", ("", "20261214T060000Z"))]
+
+
+def test_scan_ignores_nested_valarm():
+    text = (
+        "BEGIN:VEVENT\n"
+        "SUMMARY:Total lunar eclipse\n"
+        "BEGIN:VALARM\n"
+        "SUMMARY:alarm summary\n"
+        "DTSTART:20260101T000000Z\n"
+        "END:VALARM\n"
+        "DTSTART;VALUE=DATE:20261020\n"
+        "END:VEVENT\n"
+    )
+    assert scan(text) == [("Total lunar eclipse", (";VALUE=DATE", "20261020"))]
+
+
+def test_scan_skips_events_without_summary():
+    assert scan("BEGIN:VEVENT\nDTSTART:20261020T000000Z\nEND:VEVENT\n") == []
+
+
+def test_parse_utc_and_all_day():
+    assert se._parse_ics_dt("", "20261020T213000Z") == dt.datetime(2026, 10, 20, 21, 30, tzinfo=dt.timezone.utc)
+    assert se._parse_ics_dt(";VALUE=DATE", "20261020") == dt.datetime(2026, 10, 20, tzinfo=dt.timezone.utc)
+
+
+def test_parse_tzid_quoted_and_unknown():
+    london = se._parse_ics_dt(';TZID="Europe/London"', "20261020T210000")
+    assert london == dt.datetime(2026, 10, 20, 21, tzinfo=ZoneInfo("Europe/London"))
+    unknown = se._parse_ics_dt(";TZID=Mars/Olympus_Mons", "20261020T210000")
+    assert unknown.tzinfo == se.DEFAULT_TZ
+    assert se._parse_ics_dt("", "not-a-date") is None
+
+
+def test_unescape_text():
+    assert se._ics_unescape(r"Eclipse\, partial\; visible\nfrom here") == "Eclipse, partial; visible from here"
+    # an escaped backslash must not start another escape
+    assert se._ics_unescape(r"a\\n b\\, c") == r"a\n b\, c"
+
+
+FEED = [
+    "BEGIN:VCALENDAR",
+    "BEGIN:VEVENT",
+    "SUMMARY:Partial solar eclipse",
+    "DTSTART:20261020T120000Z",
+    "END:VEVENT",
+    "END:VCALENDAR",
+]
+EVENTS = [("Partial solar eclipse", ("", "20261020T120000Z"))]
+
+
+class FakeResponse:
+    """Just enough of requests.Response for fetch_astronomy_ics."""
+
+    def __init__(self, status_code=200, lines=(), headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.encoding = None
+        self._lines = list(lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, **kwargs):
+        return iter(self._lines)
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    """Point the cache at tmp_path and record the request headers of each fake GET."""
+    calls = []
+    responses = []
+
+    def fake_get(url, headers=None, **kwargs):
+        calls.append(headers or {})
+        return responses.pop(0)
+
+    monkeypatch.setattr(se, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(se.SESSION, "get", fake_get)
+    se.fetch_astronomy_ics.cache_clear()
+    yield tmp_path, calls, responses
+    se.fetch_astronomy_ics.cache_clear()
+
+
+def test_fetch_caches_body_and_sends_validators(feed):
+    cache_dir, calls, responses = feed
+    responses.append(FakeResponse(200, FEED, {"ETag": '"v1"', "Last-Modified": "Tue, 20 Oct 2026 00:00:00 GMT"}))
+    assert se.fetch_astronomy_ics(2026) == EVENTS
+    assert calls[0] == {}
+    assert (cache_dir / "2026.ics").read_text(encoding="utf-8").splitlines() == FEED
+    assert json.loads((cache_dir / "2026.json").read_text(encoding="utf-8"))["etag"] == '"v1"'
+
+    se.fetch_astronomy_ics.cache_clear()
+    responses.append(FakeResponse(304))
+    assert se.fetch_astronomy_ics(2026) == EVENTS
+    assert calls[1] == {"If-None-Match": '"v1"', "If-Modified-Since": "Tue, 20 Oct 2026 00:00:00 GMT"}
+
+
+def test_fetch_recovers_from_corrupt_cached_body(feed):
+    cache_dir, calls, responses = feed
+    (cache_dir / "2026.ics").write_bytes(b"\xff\xfe garbage")
+    (cache_dir / "2026.json").write_text(json.dumps({"etag": '"v1"'}), encoding="utf-8")
+    responses += [FakeResponse(304), FakeResponse(200, FEED, {"ETag": '"v2"'})]
+
+    assert se.fetch_astronomy_ics(2026) == EVENTS
+    assert calls == [{"If-None-Match": '"v1"'}, {}]
+    assert json.loads((cache_dir / "2026.json").read_text(encoding="utf-8"))["etag"] == '"v2"'
+
+
+def test_fetch_ignores_non_object_metadata(feed):
+    cache_dir, calls, responses = feed
+    (cache_dir / "2026.ics").write_text("\n".join(FEED), encoding="utf-8")
+    (cache_dir / "2026.json").write_text("null", encoding="utf-8")
+    responses.append(FakeResponse(200, FEED))
+
+    assert se.fetch_astronomy_ics(2026) == EVENTS
+    assert calls == [{}]
+
+
+def test_fetch_survives_cache_write_failure(feed, monkeypatch):
+    cache_dir, calls, responses = feed
+    responses.append(FakeResponse(200, FEED, {"ETag": '"v1"'}))
+
+    def locked(self, target):
+        raise PermissionError("locked")
+
+    monkeypatch.setattr(Path, "replace", locked)
+    assert se.fetch_astronomy_ics(2026) == EVENTS
+    assert list(cache_dir.iterdir()) == []